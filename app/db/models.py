@@ -57,7 +57,7 @@ class Cliente(DeclarativeBase):
 class Venda(DeclarativeBase):
     __tablename__ = "vendas"
 
-    usuario_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=True)
+    usuario_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=True, index=True)
     cliente_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID(as_uuid=True), ForeignKey("clientes.id"), nullable=True)
     total: Mapped[float] = mapped_column(Float, nullable=False)
     desconto: Mapped[float] = mapped_column(Float, default=0.0)
@@ -74,7 +74,7 @@ class Venda(DeclarativeBase):
 class ItemVenda(DeclarativeBase):
     __tablename__ = "itens_venda"
 
-    venda_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("vendas.id"), nullable=False)
+    venda_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("vendas.id"), nullable=False, index=True)
     produto_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("produtos.id"), nullable=False)
     quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
     peso_kg: Mapped[float] = mapped_column(Float, default=0.0)
@@ -11,10 +11,132 @@ import sys
 from datetime import datetime
 import subprocess
 import re
+import random
 
 # Carregar variáveis de ambiente (se houver .env)
 load_dotenv()
 
+# Backups contêm senha_hash e dados de clientes: pasta própria, ignorada pelo git
+BACKUP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
+
+# Único filtro para nomes de tabela interpolados em SQL dinâmico
+_IDENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+# Tabelas do backend (app/db/models.py), filhas antes das pais por causa das FKs.
+# O reset é por whitelist: só estas tabelas (e as que referenciam alguma delas, via
+# CASCADE) são truncadas. Se alguma não existir, o TRUNCATE falha inteiro nomeando-a.
+# Manter em sincronia com os models ao adicionar novas tabelas.
+SCHEMA_TABLES = (
+    'itens_venda',
+    'itens_divida',
+    'pagamentos_divida',
+    'abastecimentos',
+    'vendas',
+    'dividas',
+    'pdv_sync_status',
+    'empresa_config',
+    'clientes',
+    'produtos',
+    'usuarios',
+)
+
+# DDL do schema (enviado em um único round-trip por create_tables).
+# Sem parâmetros, o asyncpg usa o protocolo simples: nada de Parse/Bind por comando.
+# Novos comandos de DDL transacional devem ser adicionados aqui (índices: CREATE_INDEXES_SQL).
+CREATE_TABLES_SQL = """
+CREATE TABLE usuarios (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    nome VARCHAR(255) NOT NULL,
+    usuario VARCHAR(100) UNIQUE NOT NULL,
+    senha_hash VARCHAR(255) NOT NULL,
+    is_admin BOOLEAN DEFAULT FALSE,
+    ativo BOOLEAN DEFAULT TRUE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE produtos (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    codigo VARCHAR(50) UNIQUE NOT NULL,
+    nome VARCHAR(255) NOT NULL,
+    descricao TEXT,
+    preco_custo DECIMAL(10,2) NOT NULL,
+    preco_venda DECIMAL(10,2) NOT NULL,
+    estoque DECIMAL(10,3) DEFAULT 0,
+    estoque_minimo DECIMAL(10,3) DEFAULT 0,
+    ativo BOOLEAN DEFAULT TRUE,
+    venda_por_peso BOOLEAN DEFAULT FALSE,
+    unidade_medida VARCHAR(10) DEFAULT 'un',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE clientes (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    nome VARCHAR(255) NOT NULL,
+    nuit VARCHAR(50),
+    telefone VARCHAR(50),
+    email VARCHAR(255),
+    endereco TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE vendas (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    usuario_id UUID NOT NULL REFERENCES usuarios(id),
+    total DECIMAL(10,2) NOT NULL,
+    forma_pagamento VARCHAR(50) NOT NULL,
+    valor_recebido DECIMAL(10,2),
+    troco DECIMAL(10,2),
+    data_venda TIMESTAMP NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE itens_venda (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    venda_id UUID NOT NULL REFERENCES vendas(id) ON DELETE CASCADE,
+    produto_id VARCHAR(50) NOT NULL,
+    quantidade DECIMAL(10,3) NOT NULL,
+    preco_unitario DECIMAL(10,2) NOT NULL,
+    subtotal DECIMAL(10,2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Índices das colunas de FK (produtos.codigo já é indexado pelo UNIQUE).
+# Mesmos nomes que o create_all gera para index=True em app/db/models.py, então bancos
+# novos não ganham índices duplicados. Um comando por item: CONCURRENTLY não pode ir
+# em um bloco multi-statement.
+CREATE_INDEXES_SQL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_vendas_usuario_id ON vendas (usuario_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_itens_venda_venda_id ON itens_venda (venda_id)",
+)
+
+# Colunas do INSERT do usuário admin padrão (valores em DatabaseReset._admin_values)
+ADMIN_COLUMNS = (
+    'id', 'nome', 'usuario', 'senha_hash',
+    'is_admin', 'ativo',
+    'nivel', 'salario',
+    'pode_abastecer', 'pode_gerenciar_despesas', 'pode_fazer_devolucao',
+)
+INSERT_ADMIN_SQL = (
+    f"INSERT INTO usuarios ({', '.join(ADMIN_COLUMNS)}) "
+    f"VALUES ({', '.join(f'${i}' for i in range(1, len(ADMIN_COLUMNS) + 1))})"
+)
+
+def _sql_literal(value) -> str:
+    """Literal SQL para valores simples (str/uuid/bool/número) usados em blocos multi-statement."""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
 class DatabaseReset:
     def __init__(self):
         # Preferir URL pública quando disponível (ambiente local)
@@ -47,8 +169,22 @@ class DatabaseReset:
         last_err = None
         for attempt in range(1, retries + 1):
             try:
-                # timeout geral de conexão (segundos)
-                self.conn = await asyncpg.connect(self.database_url, timeout=10)
+                # Pool pequeno com conexões aquecidas (TLS + cache de statements);
+                # permite consultas concorrentes (ex.: backup)
+                self.pool = await asyncpg.create_pool(
+                    self.database_url,
+                    min_size=2,
+                    max_size=4,
+                    timeout=10,
+                    # Sem command_timeout no pool: COPY de backup e CREATE INDEX CONCURRENTLY
+                    # em tabelas grandes podem levar mais que qualquer limite fixo
+                    statement_cache_size=256,
+                    server_settings={
+                        'application_name': 'reset_db',
+                        # keepalive no servidor detecta quedas de rede (ex.: WinError 64)
+                        'tcp_keepalives_idle': '30',
+                    },
+                )
                 print("✅ Conectado ao banco PostgreSQL online")
                 return True
             except Exception as e:
@@ -65,7 +201,8 @@ class DatabaseReset:
                     print("   - Tente novamente, verifique internet/antivírus/firewall.")
 
                 if attempt < retries:
-                    delay = base_delay * attempt
+                    # Backoff exponencial com jitter (evita retries sincronizados)
+                    delay = min(30, base_delay * 2 ** (attempt - 1) * (0.5 + random.random()))
                     print(f"   ⏳ Aguardando {delay:.1f}s para nova tentativa...")
                     await asyncio.sleep(delay)
         print("❌ Falha ao conectar após múltiplas tentativas.")
@@ -73,67 +210,81 @@ class DatabaseReset:
     
     async def close(self):
         """Fechar conexão"""
-        if hasattr(self, 'conn'):
-            await self.conn.close()
+        if hasattr(self, 'pool'):
+            await self.pool.close()
             print("🔌 Conexão fechada")
-    
+
     async def backup_data(self):
-        """Fazer backup dos dados antes do reset"""
+        """Fazer backup dos dados antes do reset (arquivos BACKUP_DIR/backup_<tabela>_<ts>.csv).
+
+        Retorna apenas um resumo {tabela: quantidade de registros}.
+        Levanta RuntimeError se o backup de qualquer tabela falhar, para o reset não prosseguir.
+        """
         print("📦 Fazendo backup dos dados...")
         backup_data = {}
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(BACKUP_DIR, exist_ok=True)
         
-        try:
-            # Backup de usuários
-            users = await self.conn.fetch("SELECT * FROM usuarios")
-            backup_data['usuarios'] = [dict(row) for row in users]
-            print(f"   - {len(users)} usuários salvos")
-            
-            # Backup de produtos
-            produtos = await self.conn.fetch("SELECT * FROM produtos")
-            backup_data['produtos'] = [dict(row) for row in produtos]
-            print(f"   - {len(produtos)} produtos salvos")
-            
-            # Backup de clientes
-            clientes = await self.conn.fetch("SELECT * FROM clientes")
-            backup_data['clientes'] = [dict(row) for row in clientes]
-            print(f"   - {len(clientes)} clientes salvos")
-            
-            # Backup de vendas
-            vendas = await self.conn.fetch("SELECT * FROM vendas")
-            backup_data['vendas'] = [dict(row) for row in vendas]
-            print(f"   - {len(vendas)} vendas salvas")
-            
-            return backup_data
-            
-        except Exception as e:
-            print(f"⚠️  Erro no backup: {e}")
-            return {}
+        async def _dump(table):
+            # COPY ... TO STDOUT: o servidor envia os dados em bloco, sem decodificar linha a linha
+            path = os.path.join(BACKUP_DIR, f"backup_{table}_{ts}.csv")
+            try:
+                async with self.pool.acquire() as c:
+                    status = await c.copy_from_table(
+                        table, output=path, format='csv', header=True
+                    )
+            except BaseException:
+                # Não deixar arquivo parcial que pareça um backup válido
+                if os.path.exists(path):
+                    os.remove(path)
+                raise
+            # status no formato "COPY <n>"
+            return table, int(status.split()[-1])
+
+        tables = ('usuarios', 'produtos', 'clientes', 'vendas')
+        # Tabelas em paralelo (cada uma em sua conexão do pool); return_exceptions faz
+        # o gather esperar todos os COPYs terminarem antes de avaliarmos o resultado
+        results = await asyncio.gather(*[_dump(t) for t in tables], return_exceptions=True)
+
+        failed = []
+        for table, result in zip(tables, results):
+            if isinstance(result, BaseException):
+                failed.append(table)
+                print(f"   - {table}: ❌ erro no backup: {result}")
+            else:
+                backup_data[table] = result[1]
+                print(f"   - {table}: {result[1]} registros salvos")
+
+        if failed:
+            print(f"⚠️  Erro no backup: {', '.join(failed)}")
+            raise RuntimeError(f"Backup falhou para: {', '.join(failed)}. Reset cancelado.")
+        
+        return backup_data
     
     async def drop_all_tables(self):
-        """Remover todas as tabelas (mantido por compatibilidade; prefira truncate_all_tables)."""
+        """Remover todas as tabelas (mantido por compatibilidade; prefira truncate_and_create_admin)."""
         print("🗑️  Removendo todas as tabelas...")
         
         try:
-            tables = await self.conn.fetch(
-                """
-                SELECT tablename
-                FROM pg_tables
-                WHERE schemaname = 'public'
-                """
-            )
-            table_names = [t['tablename'] for t in tables]
-            if not table_names:
-                print("✅ Nenhuma tabela encontrada para remover")
-                return
-
-            for table in table_names:
-                if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", table or ""):
-                    continue
-                try:
-                    await self.conn.execute(f'DROP TABLE IF EXISTS "{table}" CASCADE')
-                    print(f"   - Tabela {table} removida")
-                except Exception as e:
-                    print(f"   - Erro ao remover {table}: {e}")
+            async with self.pool.acquire() as c:
+                tables = await c.fetch(
+                    """
+                    SELECT tablename
+                    FROM pg_tables
+                    WHERE schemaname = 'public'
+                    """
+                )
+                table_names = [t['tablename'] for t in tables]
+                if not table_names:
+                    print("✅ Nenhuma tabela encontrada para remover")
+                    return
+
+                for table in (t for t in table_names if _IDENT_RE.match(t or "")):
+                    try:
+                        await c.execute(f'DROP TABLE IF EXISTS "{table}" CASCADE')
+                        print(f"   - Tabela {table} removida")
+                    except Exception as e:
+                        print(f"   - Erro ao remover {table}: {e}")
             
             print("✅ Todas as tabelas removidas")
             
@@ -141,169 +292,124 @@ class DatabaseReset:
             print(f"❌ Erro ao remover tabelas: {e}")
             raise
 
-    async def truncate_all_tables(self):
-        """Apagar TODOS os dados preservando a estrutura (TRUNCATE em todas as tabelas do schema public)."""
-        print("🧹 Limpando TODOS os dados (TRUNCATE) preservando a estrutura...")
-
-        try:
-            tables = await self.conn.fetch(
-                """
-                SELECT tablename
-                FROM pg_tables
-                WHERE schemaname = 'public'
-                """
-            )
-            table_names = [t['tablename'] for t in tables]
-            if not table_names:
-                print("✅ Nenhuma tabela encontrada para limpar")
-                return
-
-            # Evitar apagar tabelas de migração (se existirem)
-            table_names = [t for t in table_names if t not in ('alembic_version',)]
-
-            # TRUNCATE em loop (ordem não importa com CASCADE)
-            for table in table_names:
-                if not re.match(r"^[A-Za-z_][A-Za-z0-9_]*$", table or ""):
-                    continue
-                await self.conn.execute(f'TRUNCATE TABLE "{table}" RESTART IDENTITY CASCADE')
-                print(f"   - {table}: OK")
-
-            print("✅ Todos os dados removidos (estrutura preservada)")
-        except Exception as e:
-            print(f"❌ Erro ao limpar dados: {e}")
-            raise
-    
     async def create_tables(self):
         """Recriar todas as tabelas"""
         print("🏗️  Recriando tabelas...")
         
         try:
-            # Tabela usuarios
-            await self.conn.execute("""
-                CREATE TABLE usuarios (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    nome VARCHAR(255) NOT NULL,
-                    usuario VARCHAR(100) UNIQUE NOT NULL,
-                    senha_hash VARCHAR(255) NOT NULL,
-                    is_admin BOOLEAN DEFAULT FALSE,
-                    ativo BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("   - Tabela usuarios criada")
-            
-            # Tabela produtos
-            await self.conn.execute("""
-                CREATE TABLE produtos (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    codigo VARCHAR(50) UNIQUE NOT NULL,
-                    nome VARCHAR(255) NOT NULL,
-                    descricao TEXT,
-                    preco_custo DECIMAL(10,2) NOT NULL,
-                    preco_venda DECIMAL(10,2) NOT NULL,
-                    estoque DECIMAL(10,3) DEFAULT 0,
-                    estoque_minimo DECIMAL(10,3) DEFAULT 0,
-                    ativo BOOLEAN DEFAULT TRUE,
-                    venda_por_peso BOOLEAN DEFAULT FALSE,
-                    unidade_medida VARCHAR(10) DEFAULT 'un',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("   - Tabela produtos criada")
-            
-            # Tabela clientes
-            await self.conn.execute("""
-                CREATE TABLE clientes (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    nome VARCHAR(255) NOT NULL,
-                    nuit VARCHAR(50),
-                    telefone VARCHAR(50),
-                    email VARCHAR(255),
-                    endereco TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("   - Tabela clientes criada")
-            
-            # Tabela vendas
-            await self.conn.execute("""
-                CREATE TABLE vendas (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    usuario_id UUID NOT NULL REFERENCES usuarios(id),
-                    total DECIMAL(10,2) NOT NULL,
-                    forma_pagamento VARCHAR(50) NOT NULL,
-                    valor_recebido DECIMAL(10,2),
-                    troco DECIMAL(10,2),
-                    data_venda TIMESTAMP NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("   - Tabela vendas criada")
-            
-            # Tabela itens_venda
-            await self.conn.execute("""
-                CREATE TABLE itens_venda (
-                    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-                    venda_id UUID NOT NULL REFERENCES vendas(id) ON DELETE CASCADE,
-                    produto_id VARCHAR(50) NOT NULL,
-                    quantidade DECIMAL(10,3) NOT NULL,
-                    preco_unitario DECIMAL(10,2) NOT NULL,
-                    subtotal DECIMAL(10,2) NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            print("   - Tabela itens_venda criada")
+            # Todo o DDL em um único execute; transação evita schema parcial em caso de falha
+            async with self.pool.acquire() as c:
+                async with c.transaction():
+                    await c.execute(CREATE_TABLES_SQL)
+            for table in ('usuarios', 'produtos', 'clientes', 'vendas', 'itens_venda'):
+                print(f"   - Tabela {table} criada")
             
             print("✅ Todas as tabelas recriadas")
             
         except Exception as e:
             print(f"❌ Erro ao criar tabelas: {e}")
             raise
+
+        # CONCURRENTLY não roda dentro de transação: índices só depois do commit do DDL
+        await self.create_indexes()
+
+    async def create_indexes(self):
+        """Criar índices das FKs em paralelo (CREATE INDEX CONCURRENTLY, uma conexão do pool por índice)."""
+        print("📇 Criando índices...")
+
+        async def _create(sql):
+            async with self.pool.acquire() as c:
+                await c.execute(sql)
+
+        try:
+            await asyncio.gather(*[_create(sql) for sql in CREATE_INDEXES_SQL])
+            print(f"✅ {len(CREATE_INDEXES_SQL)} índices criados")
+        except Exception as e:
+            print(f"❌ Erro ao criar índices: {e}")
+            raise
     
+    async def _admin_values(self):
+        """Valores do usuário admin padrão, por coluna de ADMIN_COLUMNS."""
+        from werkzeug.security import generate_password_hash
+        # Hash é CPU-bound: roda em thread para não bloquear o event loop
+        senha_hash = await asyncio.to_thread(generate_password_hash, "842384")
+
+        import uuid
+        return {
+            'id': uuid.uuid4(),
+            'nome': "Neotrix Tecnologias",
+            'usuario': "Neotrix",
+            'senha_hash': senha_hash,
+            'is_admin': True,
+            'ativo': True,
+            'nivel': 2,
+            'salario': 0.0,
+            'pode_abastecer': True,
+            'pode_gerenciar_despesas': True,
+            'pode_fazer_devolucao': True,
+        }
+
     async def create_admin_user(self):
-        """Criar usuário admin padrão"""
+        """Criar usuário admin padrão (sem limpar dados)"""
         print("👤 Criando usuário admin padrão...")
         
         try:
-            from werkzeug.security import generate_password_hash
-            senha_hash = generate_password_hash("842384")
-
-            import uuid
-            admin_uuid = uuid.uuid4()
-
-            await self.conn.execute(
-                """
-                INSERT INTO usuarios (
-                    id, nome, usuario, senha_hash,
-                    is_admin, ativo,
-                    nivel, salario,
-                    pode_abastecer, pode_gerenciar_despesas, pode_fazer_devolucao
-                )
-                VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11)
-                """,
-                admin_uuid,
-                "Neotrix Tecnologias",
-                "Neotrix",
-                senha_hash,
-                True,
-                True,
-                2,
-                0.0,
-                True,
-                True,
-                True,
-            )
+            admin = await self._admin_values()
+
+            # Statement reutilizado via cache de statements da conexão do pool
+            async with self.pool.acquire() as c:
+                await c.execute(INSERT_ADMIN_SQL, *(admin[col] for col in ADMIN_COLUMNS))
 
             print("✅ Usuário admin criado (nome: Neotrix Tecnologias, login: Neotrix, senha: 842384)")
             
         except Exception as e:
             print(f"❌ Erro ao criar usuário admin: {e}")
-    
+            raise
+
+    async def truncate_and_create_admin(self, create_admin: bool = False):
+        """Apagar os dados das tabelas de SCHEMA_TABLES (reset por whitelist) preservando a estrutura
+        e, opcionalmente, recriar o usuário admin padrão — tudo em um único round-trip.
+
+        Protocolo simples com vários comandos não aceita parâmetros ($1..), então os valores
+        do admin vão como literais escapados. BEGIN/COMMIT explícitos garantem tudo-ou-nada.
+        """
+        print("🧹 Limpando dados das tabelas de SCHEMA_TABLES (TRUNCATE) preservando a estrutura...")
+        if create_admin:
+            print("👤 Criando usuário admin padrão...")
+
+        try:
+            quoted = ','.join(f'"{t}"' for t in SCHEMA_TABLES)
+            statements = [f'TRUNCATE TABLE {quoted} RESTART IDENTITY CASCADE']
+            if create_admin:
+                admin = await self._admin_values()
+                columns = ', '.join(ADMIN_COLUMNS)
+                values = ', '.join(_sql_literal(admin[col]) for col in ADMIN_COLUMNS)
+                statements.append(f'INSERT INTO usuarios ({columns}) VALUES ({values})')
+            sql = 'BEGIN; ' + '; '.join(statements) + '; COMMIT;'
+
+            async with self.pool.acquire() as c:
+                try:
+                    await c.execute(sql)
+                except Exception:
+                    # Falha no meio do bloco deixa a sessão em transação abortada. Se o ROLLBACK
+                    # também falhar (conexão quebrada/timeout), descartamos a conexão sem
+                    # mascarar o erro original.
+                    if not c.is_closed() and c.is_in_transaction():
+                        try:
+                            await c.execute('ROLLBACK')
+                        except Exception:
+                            c.terminate()
+                    raise
+
+            for table in SCHEMA_TABLES:
+                print(f"   - {table}: OK")
+            print("✅ Dados removidos (estrutura preservada)")
+            if create_admin:
+                print("✅ Usuário admin criado (nome: Neotrix Tecnologias, login: Neotrix, senha: 842384)")
+        except Exception as e:
+            print(f"❌ Erro ao limpar dados: {e}")
+            raise
+
     async def reset_complete(self, create_admin: bool = False):
         """Reset completo do banco de dados"""
         print("🚨 INICIANDO RESET COMPLETO DO BANCO DE DADOS ONLINE")
@@ -313,18 +419,18 @@ class DatabaseReset:
             # 1. Fazer backup
             backup_data = await self.backup_data()
 
-            # 2. Limpar dados (preservar estrutura real do backend)
-            await self.truncate_all_tables()
+            # 2. Limpar dados (preservar estrutura real do backend) e
+            # 3. (Opcional) criar usuário admin padrão — mesma transação, um round-trip
+            await self.truncate_and_create_admin(create_admin)
 
-            # 3. (Opcional) Criar usuário admin padrão
-            if create_admin:
-                await self.create_admin_user()
+            # 4. Garantir índices das FKs em bancos criados antes deles (idempotente)
+            await self.create_indexes()
             
             print("=" * 60)
             print("✅ RESET COMPLETO CONCLUÍDO COM SUCESSO!")
             print("📊 Resumo:")
             print(f"   - Backup realizado: {len(backup_data)} tabelas")
-            print("   - Todas as tabelas foram truncadas (dados removidos)")
+            print("   - Tabelas de SCHEMA_TABLES truncadas (dados removidos)")
             if create_admin:
                 print("   - Usuário admin foi recriado automaticamente")
             else:
@@ -343,15 +449,16 @@ class DatabaseReset:
             # Fazer backup
             backup_data = await self.backup_data()
 
-            # Limpar dados de todas as tabelas e (opcionalmente) recriar admin
-            await self.truncate_all_tables()
-            if create_admin:
-                await self.create_admin_user()
+            # Limpar dados de todas as tabelas e (opcionalmente) recriar admin, em uma transação
+            await self.truncate_and_create_admin(create_admin)
+
+            # Garantir índices das FKs (idempotente; tabelas vazias, build imediato)
+            await self.create_indexes()
             
             print("=" * 60)
             print("✅ LIMPEZA DE DADOS CONCLUÍDA!")
             print("   - Estrutura das tabelas mantida")
-            print("   - Todos os dados removidos")
+            print("   - Tabelas de SCHEMA_TABLES truncadas (dados removidos)")
             if create_admin:
                 print("   - Usuário admin foi recriado automaticamente")
             else:
@@ -469,5 +576,20 @@ if __name__ == "__main__":
         print("❌ Dependências faltando. Execute:")
         print("   pip install asyncpg passlib[bcrypt]")
         sys.exit(1)
-    
-    asyncio.run(main())
+
+    # uvloop (instalado com uvicorn[standard]) acelera o asyncpg; não existe build para Windows
+    loop_factory = None
+    if sys.platform != 'win32':
+        try:
+            import uvloop
+            loop_factory = uvloop.new_event_loop
+        except ImportError:
+            pass
+
+    if loop_factory is not None and sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(main())
+    else:
+        if loop_factory is not None:
+            uvloop.install()
+        asyncio.run(main())